@@ -1,4 +1,4 @@
-from functools import lru_cache
+from functools import cache
 from pathlib import Path
 from typing import Optional
 
@@ -21,18 +21,24 @@ class Settings(BaseSettings):
     llm_top_p: float = 0.95
 
     enable_metal_acceleration: bool = True
+    preload: bool = True
 
     brave_result_count: int = 6
     brave_safe_search: str = "moderate"
+    brave_cache_size: int = 256
+    brave_cache_ttl_seconds: float = 120.0
 
     max_concurrent_fetches: int = 4
     fetch_timeout_seconds: float = 12.0
+    scrape_max_bytes: int = 1_500_000
     user_agent: str = (
         "ScarperBot/0.1 (+https://github.com/cto-dot-new/scarper; contact=ops@cto.new)"
     )
 
     summary_max_tokens: int = 256
     summary_chunk_size: int = 1200
+    summary_cache_size: int = 256
+    summary_skip_threshold: int = 150
 
     final_answer_max_tokens: int = 768
 
@@ -40,9 +46,10 @@ class Settings(BaseSettings):
         env_file=".env",
         env_prefix="SCARPER_",
         extra="ignore",
+        frozen=True,
     )
 
 
-@lru_cache
+@cache
 def get_settings() -> Settings:
     return Settings()
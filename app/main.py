@@ -1,27 +1,63 @@
 from __future__ import annotations
 
 import logging
-from functools import lru_cache
+from contextlib import asynccontextmanager
+from functools import cache
+from typing import AsyncIterator
 
 from fastapi import Depends, FastAPI, HTTPException
 
-from app.config import Settings, get_settings
+from app.config import get_settings
 from app.models import HealthResponse, QueryRequest, QueryResponse
 from app.pipelines.retrieval_augmented import RetrievalAugmentedPipeline
 from app.services.brave_search import BraveSearchError, BraveSearchService
 from app.services.llm_runtime import LocalLLM
 from app.services.scraper import WebScraperService
+from app.services.summarizer import SYSTEM_PROMPT as SUMMARY_SYSTEM_PROMPT
 from app.services.summarizer import SummarizerService
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    app.state.ready = False
+    if get_settings().preload:
+        try:
+            get_llm()
+            get_brave_service()
+            await get_scraper_service().start()
+            get_summarizer_service()
+            get_pipeline()
+        except Exception:  # pragma: no cover - configuration or model load error
+            logger.exception("Preload failed; /health/ready will report 503")
+        else:
+            try:
+                # Each /query starts by summarizing, so that prompt is the one worth keeping resident.
+                await get_llm().warmup(SUMMARY_SYSTEM_PROMPT)
+            except Exception as exc:  # pragma: no cover - local runtime failure
+                logger.warning("Prompt cache warmup failed: %s", exc)
+            app.state.ready = True
+            logger.info("Local model and services preloaded")
+    else:
+        app.state.ready = True
+    yield
+    if get_brave_service.cache_info().currsize:
+        await get_brave_service().aclose()
+    if get_scraper_service.cache_info().currsize:
+        await get_scraper_service().aclose()
+    if _get_llm_instance.cache_info().currsize:
+        _get_llm_instance().close()
+
+
 app = FastAPI(
     title="Scarper Research Service",
     version="0.1.0",
     description=(
         "Bridges a local multimodal LLaVA instance with real-time web search, scraping, and summarisation."
     ),
+    lifespan=lifespan,
 )
 
 
@@ -33,28 +69,28 @@ def get_llm() -> LocalLLM:
         raise HTTPException(status_code=500, detail=str(exc))
 
 
-@lru_cache
+@cache
 def _get_llm_instance() -> LocalLLM:
     settings = get_settings()
     return LocalLLM(settings)
 
 
-@lru_cache
+@cache
 def get_brave_service() -> BraveSearchService:
     return BraveSearchService(get_settings())
 
 
-@lru_cache
+@cache
 def get_scraper_service() -> WebScraperService:
     return WebScraperService(get_settings())
 
 
-@lru_cache
+@cache
 def get_summarizer_service() -> SummarizerService:
     return SummarizerService(get_llm(), get_settings())
 
 
-@lru_cache
+@cache
 def get_pipeline() -> RetrievalAugmentedPipeline:
     settings = get_settings()
     return RetrievalAugmentedPipeline(
@@ -67,28 +103,32 @@ def get_pipeline() -> RetrievalAugmentedPipeline:
 
 
 @app.get("/health", response_model=HealthResponse)
+@app.get("/health/live", response_model=HealthResponse)
 async def health() -> HealthResponse:
     return HealthResponse(status="ok")
 
 
+@app.get("/health/ready", response_model=HealthResponse)
+async def health_ready() -> HealthResponse:
+    if not getattr(app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="Preload failed; see logs")
+    return HealthResponse(status="ready")
+
+
 @app.post("/query", response_model=QueryResponse)
 async def query_endpoint(
     request: QueryRequest,
     pipeline: RetrievalAugmentedPipeline = Depends(get_pipeline),
-    settings: Settings = Depends(get_settings),
 ) -> QueryResponse:
-    top_k = min(request.top_k, settings.brave_result_count)
+    top_k = min(request.top_k, pipeline.settings.brave_result_count)
 
     try:
         return await pipeline.run(
             query=request.query,
             top_k=top_k,
-            image_base64=request.image_base64,
+            image_bytes=request.image_bytes,
         )
     except BraveSearchError as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
     except ValueError as exc:
-        message = str(exc)
-        if "Invalid base64" in message:
-            raise HTTPException(status_code=400, detail=message) from exc
-        raise HTTPException(status_code=404, detail=message)
+        raise HTTPException(status_code=404, detail=str(exc))
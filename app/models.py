@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import base64
+import binascii
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+import msgspec
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
+
+
+class SearchResult(msgspec.Struct, frozen=True):
+    """Lightweight search hit used inside the pipeline; converted to SearchDocument for responses."""
+
+    url: str
+    title: str
+    snippet: Optional[str] = None
 
 
 class SearchDocument(BaseModel):
@@ -23,6 +34,28 @@ class QueryRequest(BaseModel):
         ),
     )
 
+    _image_bytes: Optional[bytes] = PrivateAttr(None)
+
+    @field_validator("image_base64")
+    @classmethod
+    def _strip_data_url_prefix(cls, value: Optional[str]) -> Optional[str]:
+        if value and value.startswith("data:") and "," in value:
+            return value.split(",", 1)[1]
+        return value
+
+    @model_validator(mode="after")
+    def _decode_image(self) -> "QueryRequest":
+        if self.image_base64:
+            try:
+                self._image_bytes = base64.b64decode(self.image_base64, validate=True)
+            except binascii.Error as exc:
+                raise ValueError("Invalid base64 image payload") from exc
+        return self
+
+    @property
+    def image_bytes(self) -> Optional[bytes]:
+        return self._image_bytes
+
 
 class QueryResponse(BaseModel):
     answer: str
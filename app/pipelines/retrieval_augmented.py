@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Iterable, List, Optional
+from typing import AsyncIterator, List, Optional
+
+import msgspec
 
 from app.config import Settings
 from app.models import QueryResponse, SearchDocument
@@ -12,6 +15,12 @@ from app.services.summarizer import SummarizerService
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = (
+    "You are Scarper, a focused research assistant connected to a private local LLM. "
+    "You must ground every answer in the supplied web context. "
+    "Cite sources using bracketed indices like [1]. If the context is insufficient, say you don't know."
+)
+
 
 class RetrievalAugmentedPipeline:
     def __init__(
@@ -28,39 +37,37 @@ class RetrievalAugmentedPipeline:
         self._summarizer = summarizer
         self._llm = llm
 
+    @property
+    def settings(self) -> Settings:
+        return self._settings
+
     async def run(
         self,
         query: str,
         top_k: int,
-        image_base64: Optional[str] = None,
+        image_bytes: Optional[bytes] = None,
     ) -> QueryResponse:
         search_results = await self._search.search(query, count=top_k)
         if not search_results:
             raise ValueError("No search results returned for the supplied query")
 
-        scraped_docs = await self._scraper.fetch_documents(
-            (doc.url, doc.title) for doc in search_results
+        summary_map = await self._summaries_by_url(
+            self._scraper.fetch_documents((doc.url, doc.title) for doc in search_results)
         )
-        summary_map = await self._summaries_by_url(scraped_docs)
 
         contexts = []
         filtered_sources: List[SearchDocument] = []
         for idx, doc in enumerate(search_results, start=1):
             summary = summary_map.get(doc.url)
             if summary:
-                doc.summary = summary
                 contexts.append(
                     f"[{idx}] {doc.title}\nURL: {doc.url}\nSummary:\n{summary}"
                 )
-                filtered_sources.append(doc)
+                filtered_sources.append(
+                    SearchDocument(**msgspec.structs.asdict(doc), summary=summary)
+                )
 
         context_section = "\n\n".join(contexts)
-        system_prompt = (
-            "You are Scarper, a focused research assistant connected to a private local LLM. "
-            "You must ground every answer in the supplied web context. "
-            "Cite sources using bracketed indices like [1]. If the context is insufficient, say you don't know."
-        )
-
         user_prompt_parts = [
             f"User question: {query}",
         ]
@@ -78,15 +85,11 @@ class RetrievalAugmentedPipeline:
         user_prompt = "\n\n".join(user_prompt_parts)
 
         user_content: List[dict] = [LocalLLM.format_text_content(user_prompt)]
-        if image_base64:
-            cleaned = _strip_data_url_prefix(image_base64)
-            try:
-                user_content.append(LocalLLM.format_image_content(cleaned))
-            except ValueError as exc:
-                raise ValueError("Invalid base64 image payload") from exc
+        if image_bytes:
+            user_content.append(LocalLLM.format_image_content(image_bytes))
 
         messages = [
-            {"role": "system", "content": [LocalLLM.format_text_content(system_prompt)]},
+            {"role": "system", "content": [LocalLLM.format_text_content(SYSTEM_PROMPT)]},
             {"role": "user", "content": user_content},
         ]
 
@@ -97,20 +100,40 @@ class RetrievalAugmentedPipeline:
             top_p=self._settings.llm_top_p,
         )
 
-        return QueryResponse(answer=answer, sources=filtered_sources or search_results)
+        sources = filtered_sources or [
+            SearchDocument(**msgspec.structs.asdict(doc)) for doc in search_results
+        ]
+        return QueryResponse(answer=answer, sources=sources)
 
     async def _summaries_by_url(
-        self, scraped_docs: Iterable[ScrapedDocument]
+        self, scraped_docs: AsyncIterator[ScrapedDocument]
     ) -> dict[str, str]:
+        # Summarization starts with the first fetched page; pages that arrive while a
+        # summary call is running are batched into the next one as soon as it finishes.
+        arrivals: asyncio.Queue[Optional[ScrapedDocument]] = asyncio.Queue()
+
+        async def _collect() -> None:
+            try:
+                async for doc in scraped_docs:
+                    arrivals.put_nowait(doc)
+            finally:
+                arrivals.put_nowait(None)
+
+        collector = asyncio.create_task(_collect())
         summary_map: dict[str, str] = {}
-        for doc in scraped_docs:
-            summary = await self._summarizer.summarize(doc)
-            if summary:
-                summary_map[doc.url] = summary
+        try:
+            finished = False
+            while not finished:
+                waiting = [await arrivals.get()]
+                while not arrivals.empty():
+                    waiting.append(arrivals.get_nowait())
+                batch = [doc for doc in waiting if doc is not None]
+                finished = len(batch) < len(waiting)
+                if batch:
+                    summary_map.update(await self._summarizer.summarize_many(batch))
+        finally:
+            if not collector.done():
+                collector.cancel()
+        await collector
         return summary_map
 
-
-def _strip_data_url_prefix(image_base64: str) -> str:
-    if "," in image_base64 and image_base64.startswith("data:"):
-        return image_base64.split(",", 1)[1]
-    return image_base64
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 
 import httpx
+import msgspec
+from cachetools import TTLCache
 from tenacity import AsyncRetrying, RetryError, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from app.config import Settings
-from app.models import SearchDocument
+from app.models import SearchResult
 
 logger = logging.getLogger(__name__)
 
@@ -16,49 +18,73 @@ class BraveSearchError(RuntimeError):
     pass
 
 
+class _BraveResult(msgspec.Struct):
+    url: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+
+class _BraveWeb(msgspec.Struct):
+    results: List[_BraveResult] = []
+
+
+class _BravePayload(msgspec.Struct):
+    web: _BraveWeb = msgspec.field(default_factory=_BraveWeb)
+
+
+_payload_decoder = msgspec.json.Decoder(_BravePayload)
+
+
 class BraveSearchService:
     def __init__(self, settings: Settings):
         self._settings = settings
+        self._client = httpx.AsyncClient(
+            timeout=settings.fetch_timeout_seconds,
+            follow_redirects=True,
+            headers={
+                "User-Agent": settings.user_agent,
+                "Accept": "application/json",
+                "X-Subscription-Token": settings.brave_api_key,
+            },
+            http2=True,
+        )
+        self._cache: TTLCache[Tuple[str, int, str], List[SearchResult]] = TTLCache(
+            maxsize=settings.brave_cache_size,
+            ttl=settings.brave_cache_ttl_seconds,
+        )
 
-    async def search(self, query: str, count: int) -> List[SearchDocument]:
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def search(self, query: str, count: int) -> List[SearchResult]:
         params = {
             "q": query,
             "count": min(count, 20),
             "search_lang": "en",
             "safesearch": self._settings.brave_safe_search,
         }
-        headers = {
-            "User-Agent": self._settings.user_agent,
-            "Accept": "application/json",
-            "X-Subscription-Token": self._settings.brave_api_key,
-        }
+        key = (query, params["count"], params["safesearch"])
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
 
-        async def _do_request() -> List[SearchDocument]:
-            async with httpx.AsyncClient(timeout=self._settings.fetch_timeout_seconds) as client:
-                response = await client.get(
-                    self._settings.brave_search_endpoint,
-                    params=params,
-                    headers=headers,
-                    follow_redirects=True,
-                )
-                response.raise_for_status()
-                payload = response.json()
-
-            web = payload.get("web", {})
-            results = web.get("results", [])
-
-            documents: List[SearchDocument] = []
-            for item in results:
-                url = item.get("url")
-                title = item.get("title", "")
-                snippet = item.get("description")
-                if not url or not title:
+        async def _do_request() -> List[SearchResult]:
+            response = await self._client.get(self._settings.brave_search_endpoint, params=params)
+            response.raise_for_status()
+            try:
+                payload = _payload_decoder.decode(response.content)
+            except msgspec.DecodeError as exc:
+                raise BraveSearchError("Brave returned an unexpected search payload") from exc
+
+            documents: List[SearchResult] = []
+            for item in payload.web.results:
+                if not item.url or not item.title:
                     continue
                 documents.append(
-                    SearchDocument(
-                        url=url,
-                        title=title,
-                        snippet=snippet,
+                    SearchResult(
+                        url=item.url,
+                        title=item.title,
+                        snippet=item.description,
                     )
                 )
             return documents
@@ -73,7 +99,11 @@ class BraveSearchService:
         try:
             async for attempt in retrying:
                 with attempt:
-                    return await _do_request()
+                    documents = await _do_request()
         except RetryError as exc:  # pragma: no cover - defensive logging
             logger.error("Brave search failed after retries", exc_info=exc)
             raise BraveSearchError("Unable to retrieve search results from Brave") from exc
+
+        if documents:
+            self._cache[key] = list(documents)
+        return documents
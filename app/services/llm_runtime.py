@@ -1,13 +1,12 @@
 from __future__ import annotations
 
 import asyncio
-import base64
-import binascii
 import logging
+import queue
+import threading
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-from llama_cpp import Llama
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.config import Settings
 
@@ -18,6 +17,8 @@ class LocalLLM:
     """Wrapper around llama.cpp for multimodal chat completions."""
 
     def __init__(self, settings: Settings):
+        from llama_cpp import Llama
+
         self._settings = settings
         model_path = settings.llm_model_path.expanduser().resolve()
         if not model_path.exists():
@@ -49,6 +50,14 @@ class LocalLLM:
 
         self._llama = Llama(**kwargs)
 
+        # llama.cpp contexts are not thread-safe, so a single worker thread owns all inference.
+        self._inbox: "queue.Queue[Optional[Tuple[Dict[str, Any], Future]]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run_worker, name="llama-worker", daemon=True)
+        self._worker.start()
+
+    def close(self) -> None:
+        self._inbox.put(None)
+
     async def chat(
         self,
         messages: List[Dict[str, Any]],
@@ -64,22 +73,55 @@ class LocalLLM:
         }
 
         logger.debug("Dispatching chat completion with %d messages", len(messages))
-        response = await asyncio.to_thread(self._llama.create_chat_completion, **completion_kwargs)
+        future: Future = Future()
+        self._inbox.put((completion_kwargs, future))
+        response = await asyncio.wrap_future(future)
         choices = response.get("choices", [])
         if not choices:
             raise RuntimeError("No choices returned by local LLM")
         return choices[0]["message"]["content"].strip()
 
+    def count_tokens(self, text: str) -> int:
+        # Tokenization only reads the model vocabulary, not the context owned by the worker thread.
+        return len(self._llama.tokenize(text.encode("utf-8"), add_bos=False))
+
+    def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        tokens = self._llama.tokenize(text.encode("utf-8"), add_bos=False)
+        if len(tokens) <= max_tokens:
+            return text
+        return self._llama.detokenize(tokens[:max_tokens]).decode("utf-8", errors="ignore").strip()
+
+    async def warmup(self, system_prompt: str) -> None:
+        """Prefill a system prompt so the next request that starts with it reuses the evaluated prefix.
+
+        llama.cpp only keeps the tokens of the most recent evaluation, so only the last warmed
+        prompt stays resident; any other completion replaces it.
+        """
+        messages = [
+            {"role": "system", "content": [self.format_text_content(system_prompt)]},
+            {"role": "user", "content": [self.format_text_content("ok")]},
+        ]
+        await self.chat(messages, max_tokens=1)
+
+    def _run_worker(self) -> None:
+        while True:
+            item = self._inbox.get()
+            if item is None:
+                return
+            completion_kwargs, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._llama.create_chat_completion(**completion_kwargs))
+            except BaseException as exc:  # pragma: no cover - surfaced to the awaiting caller
+                future.set_exception(exc)
+
     @staticmethod
     def format_text_content(text: str) -> Dict[str, str]:
         return {"type": "text", "text": text}
 
     @staticmethod
-    def format_image_content(image_base64: str) -> Dict[str, Any]:
-        try:
-            image_bytes = base64.b64decode(image_base64, validate=True)
-        except binascii.Error as exc:
-            raise ValueError("Invalid base64 supplied for image content") from exc
+    def format_image_content(image_bytes: bytes) -> Dict[str, Any]:
         return {
             "type": "image",
             "image": {
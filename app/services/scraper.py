@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from copy import deepcopy
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Tuple
+from functools import cache
+from typing import Any, AsyncIterator, Iterable, Optional, Tuple
 
 import httpx
-import trafilatura
-from bs4 import BeautifulSoup
 
 from app.config import Settings
 
@@ -25,71 +29,193 @@ class WebScraperService:
     def __init__(self, settings: Settings):
         self._settings = settings
         self._semaphore = asyncio.Semaphore(settings.max_concurrent_fetches)
+        self._inflight: dict[str, asyncio.Future[Optional[ScrapedDocument]]] = {}
+        self._client = httpx.AsyncClient(
+            timeout=settings.fetch_timeout_seconds,
+            follow_redirects=True,
+            headers={
+                "User-Agent": settings.user_agent,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            },
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.max_concurrent_fetches * 2,
+                max_keepalive_connections=settings.max_concurrent_fetches,
+            ),
+        )
+
+        self._executor = self._new_executor()
+
+    async def start(self) -> None:
+        """Spawn the extraction workers and import the extractors before the first query."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, _preload_extractors)
+                for _ in range(self._settings.max_concurrent_fetches)
+            )
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
-    async def fetch_documents(self, documents: Iterable[tuple[str, str]]) -> List[ScrapedDocument]:
-        """Fetch multiple documents concurrently.
+    async def fetch_documents(self, documents: Iterable[tuple[str, str]]) -> AsyncIterator[ScrapedDocument]:
+        """Fetch multiple documents concurrently, yielding each as soon as it is ready.
 
         Args:
             documents: Iterable of (url, fallback_title)
         """
-        tasks = [self._bounded_fetch(url, title) for url, title in documents]
-        return [doc for doc in await asyncio.gather(*tasks) if doc is not None]
+        tasks = [asyncio.ensure_future(self._bounded_fetch(url, title)) for url, title in documents]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                doc = await next_done
+                if doc is not None:
+                    yield doc
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def _bounded_fetch(self, url: str, fallback_title: str) -> Optional[ScrapedDocument]:
+        # Concurrent requests for the same URL share a single fetch.
+        pending = self._inflight.get(url)
+        if pending is None:
+            pending = asyncio.ensure_future(self._guarded_fetch(url, fallback_title))
+            self._inflight[url] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(pending)
+
+    async def _guarded_fetch(self, url: str, fallback_title: str) -> Optional[ScrapedDocument]:
         async with self._semaphore:
             return await self._fetch(url, fallback_title)
 
     async def _fetch(self, url: str, fallback_title: str) -> Optional[ScrapedDocument]:
-        headers = {
-            "User-Agent": self._settings.user_agent,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        }
         try:
-            async with httpx.AsyncClient(timeout=self._settings.fetch_timeout_seconds, follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                html = response.text
+            html = await self._download(url)
         except Exception as exc:  # pragma: no cover - network failure is external
             logger.warning("Unable to fetch %s: %s", url, exc)
             return None
+        if html is None:
+            return None
 
         try:
-            downloaded = trafilatura.extract(
-                html,
-                url=url,
-                include_comments=False,
-                include_tables=False,
-                no_fallback=True,
-            )
-        except Exception as exc:  # pragma: no cover - library failure
-            logger.warning("Trafilatura extraction failed for %s: %s", url, exc)
-            downloaded = None
-
-        text_content = downloaded.strip() if downloaded else None
-        fallback_html_title: Optional[str] = None
+            text_content, title = await self._extract(html, url)
+        except Exception as exc:  # pragma: no cover - worker process failure
+            logger.warning("Extraction failed for %s: %s", url, exc)
+            return None
 
         if not text_content:
-            text_content, fallback_html_title = self._fallback_extract(html)
-            if not text_content:
-                logger.debug("Unable to extract meaningful text for %s", url)
+            logger.debug("Unable to extract meaningful text for %s", url)
+            return None
+
+        return ScrapedDocument(url=url, title=title or fallback_title, text=text_content)
+
+    async def _extract(self, html: str, url: str) -> Tuple[Optional[str], Optional[str]]:
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            return await loop.run_in_executor(executor, _extract_sync, html, url)
+        except BrokenProcessPool:
+            # A worker died abruptly (crash or OOM kill); replace the pool once and retry.
+            logger.warning("Extraction pool broke while processing %s; restarting it", url)
+            if self._executor is executor:
+                self._executor = self._new_executor()
+                executor.shutdown(wait=False, cancel_futures=True)
+            return await loop.run_in_executor(self._executor, _extract_sync, html, url)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Spawn rather than fork: workers start after the llama worker thread exists.
+        return ProcessPoolExecutor(
+            max_workers=self._settings.max_concurrent_fetches,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def _download(self, url: str) -> Optional[str]:
+        limit = self._settings.scrape_max_bytes
+        async with self._client.stream("GET", url) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            if content_type and "html" not in content_type.lower():
+                logger.debug("Skipping %s with content type %s", url, content_type)
+                return None
+            content_length = response.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > limit:
+                logger.debug("Skipping %s with content length %s", url, content_length)
                 return None
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes(65536):
+                buffer.extend(chunk)
+                if len(buffer) >= limit:
+                    logger.debug("Truncating %s at %d bytes", url, limit)
+                    break
+            encoding = response.charset_encoding or "utf-8"
+        try:
+            return buffer[:limit].decode(encoding, errors="replace")
+        except LookupError:
+            return buffer[:limit].decode("utf-8", errors="replace")
+
+
+def _preload_extractors() -> None:
+    import lxml.html  # noqa: F401
+    import trafilatura  # noqa: F401
+
+
+def _extract_sync(html: str, url: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract ``(text, title)`` from raw HTML; runs inside the scraper's process pool."""
+    import trafilatura
+    from trafilatura.utils import load_html
+
+    # Parse once and share the tree; extraction prunes what it is given, so it gets a copy and
+    # metadata is read from the untouched tree only for pages that yielded text.
+    tree = load_html(html)
+    if tree is None:
+        return _fallback_extract(html)
+
+    try:
+        downloaded = trafilatura.extract(
+            deepcopy(tree),
+            url=url,
+            include_comments=False,
+            include_tables=False,
+            no_fallback=True,
+        )
+    except Exception as exc:  # pragma: no cover - library failure
+        logger.warning("Trafilatura extraction failed for %s: %s", url, exc)
+        downloaded = None
+
+    text_content = downloaded.strip() if downloaded else None
+    if not text_content:
+        return _fallback_extract(html)
+
+    metadata = trafilatura.extract_metadata(tree, default_url=url)
+    return text_content, metadata.title if metadata else None
+
+
+_XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+@cache
+def _noise_xpath() -> Any:
+    from lxml import etree
+
+    return etree.XPath("//script|//style|//noscript|//template")
 
-        metadata = trafilatura.extract_metadata(html, url=url) if downloaded else None
-        meta_title = metadata.title if metadata else None
-        title = meta_title or fallback_html_title or fallback_title
 
-        return ScrapedDocument(url=url, title=title, text=text_content)
+def _fallback_extract(html: str) -> Tuple[Optional[str], Optional[str]]:
+    import lxml.html
+    from lxml.etree import ParserError
 
-    def _fallback_extract(self, html: str) -> Tuple[Optional[str], Optional[str]]:
-        soup = BeautifulSoup(html, "html.parser")
+    try:
+        # lxml refuses str input that carries an XML encoding declaration.
+        root = lxml.html.fromstring(_XML_DECLARATION.sub("", html, count=1))
+    except (ParserError, ValueError):
+        return None, None
 
-        for tag in soup(["script", "style", "noscript", "template"]):
-            tag.decompose()
+    title = root.findtext(".//title")
+    title = title.strip() if title else None
 
-        title = None
-        if soup.title and soup.title.string:
-            title = soup.title.string.strip()
+    for element in _noise_xpath()(root):
+        element.drop_tree()
 
-        text = " ".join(s.strip() for s in soup.stripped_strings)
-        cleaned = text.strip()
-        return (cleaned if cleaned else None, title)
+    text = " ".join(" ".join(chunk.split()) for chunk in root.itertext() if chunk.strip())
+    return (text if text else None, title or None)
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from typing import Optional
+import re
+from collections import OrderedDict
+from typing import Optional, Sequence
 
 from app.config import Settings
 from app.services.llm_runtime import LocalLLM
@@ -9,25 +13,48 @@ from app.services.scraper import ScrapedDocument
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = (
+    "You are a precise research assistant. Produce concise but information-dense summaries "
+    "highlighting key facts, statistics, quotes, and caveats. Use bullet points when appropriate."
+)
+
+_SECTION_HEADER = re.compile(r"^[ \t]*#{2,4}[ \t]*\[(\d+)\][ \t]*", re.MULTILINE)
+
+# Headroom for the chat template's role markers around the system and user messages.
+_CHAT_TEMPLATE_TOKENS = 64
+# Below this many tokens per page a combined prompt loses too much content to be worth it.
+_MIN_BATCH_DOC_TOKENS = 256
+
 
 class SummarizerService:
     def __init__(self, llm: LocalLLM, settings: Settings):
         self._llm = llm
         self._settings = settings
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[Optional[str]]] = {}
 
     async def summarize(self, document: ScrapedDocument) -> Optional[str]:
         if not document.text:
             return None
+        if self._is_short(document.text):
+            return document.text.strip()
 
-        prepared = self._prepare_text(document.text)
+        key = _content_key(document.text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._summarize_one(document, key))
+            self._track(key, pending)
+        return await asyncio.shield(pending)
+
+    async def _summarize_one(self, document: ScrapedDocument, key: str) -> Optional[str]:
+        prepared = self._prepare_text(document.text or "")
         if not prepared:
             return None
 
-        system_prompt = (
-            "You are a precise research assistant. Produce concise but information-dense summaries "
-            "highlighting key facts, statistics, quotes, and caveats. Use bullet points when appropriate."
-        )
-
         user_prompt = (
             "Summarize the following webpage content so it can be used as grounding context for another "
             "larger prompt. Keep it under 200 words and avoid redundancy.\n\n"
@@ -35,7 +62,7 @@ class SummarizerService:
         )
 
         messages = [
-            {"role": "system", "content": [LocalLLM.format_text_content(system_prompt)]},
+            {"role": "system", "content": [LocalLLM.format_text_content(SYSTEM_PROMPT)]},
             {"role": "user", "content": [LocalLLM.format_text_content(user_prompt)]},
         ]
 
@@ -50,11 +77,176 @@ class SummarizerService:
             logger.error("Failed to summarize document %s: %s", document.url, exc)
             return None
 
-        return summary.strip()
+        summary = summary.strip()
+        if summary:
+            self._cache_put(key, summary)
+        return summary
+
+    async def summarize_many(self, documents: Sequence[ScrapedDocument]) -> dict[str, str]:
+        """Summarize several documents with a single chat completion.
+
+        Each document is enumerated as ``[i]`` in one user message and the model is asked
+        to answer with ``### [i]`` delimited sections, which are parsed back per URL.
+        """
+        summary_map: dict[str, str] = {}
+        pending: dict[str, asyncio.Future[Optional[str]]] = {}
+        candidates: list[ScrapedDocument] = []
+        for doc in documents:
+            if not doc.text:
+                continue
+            if self._is_short(doc.text):
+                summary_map[doc.url] = doc.text.strip()
+                continue
+            key = _content_key(doc.text)
+            cached = self._cache_get(key)
+            if cached is not None:
+                summary_map[doc.url] = cached
+            elif key in self._inflight:
+                pending[doc.url] = self._inflight[key]
+            else:
+                candidates.append(doc)
+
+        if candidates:
+            # Register each candidate so concurrent callers wait on this batch instead of re-summarizing.
+            batch = asyncio.ensure_future(self._summarize_batch(candidates))
+            for doc in candidates:
+                key = _content_key(doc.text or "")
+                if key not in self._inflight:
+                    self._track(key, asyncio.ensure_future(_summary_for(batch, doc.url)))
+                pending[doc.url] = self._inflight[key]
+
+        for url, future in pending.items():
+            summary = await asyncio.shield(future)
+            if summary:
+                summary_map[url] = summary
+        return summary_map
+
+    async def _summarize_batch(self, candidates: Sequence[ScrapedDocument]) -> dict[str, str]:
+        if len(candidates) == 1:
+            return await self._summarize_each(candidates)
+
+        instructions = (
+            f"Summarize each of the following {len(candidates)} webpages separately so they can be used as "
+            "grounding context for another larger prompt. Keep each summary under 200 words and avoid "
+            "redundancy. Start every summary on its own line with a header of the form `### [n]`, where n "
+            "is the webpage number, and output nothing else outside those sections."
+        )
+        headers = [
+            f"[{idx}] Content from {doc.title or doc.url}:"
+            for idx, doc in enumerate(candidates, start=1)
+        ]
+
+        # Size the combined prompt in model tokens so prompt plus output fits the context window.
+        max_tokens = self._settings.summary_max_tokens * len(candidates)
+        overhead = (
+            self._llm.count_tokens(SYSTEM_PROMPT)
+            + self._llm.count_tokens(instructions)
+            + sum(self._llm.count_tokens(header) + 4 for header in headers)
+            + _CHAT_TEMPLATE_TOKENS
+        )
+        per_doc = (self._settings.llm_context_window - max_tokens - overhead) // len(candidates)
+        if per_doc < _MIN_BATCH_DOC_TOKENS:
+            logger.debug("Context too small to batch %d documents; summarizing individually", len(candidates))
+            return await self._summarize_each(candidates)
+
+        sections = [
+            f"{header}\n\n{self._llm.truncate_to_tokens(self._prepare_text(doc.text or ''), per_doc)}"
+            for header, doc in zip(headers, candidates)
+        ]
+        user_prompt = instructions + "\n\n" + "\n\n".join(sections)
+
+        messages = [
+            {"role": "system", "content": [LocalLLM.format_text_content(SYSTEM_PROMPT)]},
+            {"role": "user", "content": [LocalLLM.format_text_content(user_prompt)]},
+        ]
+
+        try:
+            response = await self._llm.chat(
+                messages,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                top_p=0.9,
+            )
+        except Exception as exc:  # pragma: no cover - local runtime failure
+            logger.warning(
+                "Batched summary of %d documents failed, summarizing individually: %s", len(candidates), exc
+            )
+            return await self._summarize_each(candidates)
+
+        parsed = _split_sections(response)
+        summary_map: dict[str, str] = {}
+        missing: list[ScrapedDocument] = []
+        for idx, doc in enumerate(candidates, start=1):
+            summary = parsed.get(idx)
+            if summary:
+                summary_map[doc.url] = summary
+                self._cache_put(_content_key(doc.text or ""), summary)
+            else:
+                missing.append(doc)
+
+        if missing:
+            logger.warning(
+                "Batched summary omitted %d of %d documents, summarizing them individually",
+                len(missing),
+                len(candidates),
+            )
+            summary_map.update(await self._summarize_each(missing))
+        return summary_map
+
+    async def _summarize_each(self, documents: Sequence[ScrapedDocument]) -> dict[str, str]:
+        summary_map: dict[str, str] = {}
+        for doc in documents:
+            summary = await self._summarize_one(doc, _content_key(doc.text or ""))
+            if summary:
+                summary_map[doc.url] = summary
+        return summary_map
+
+    def _is_short(self, text: str) -> bool:
+        threshold = self._settings.summary_skip_threshold
+        # Pages this long always clear the threshold, so skip splitting them into words.
+        if len(text) > threshold * 20:
+            return False
+        return len(text.split()) < threshold
+
+    def _track(self, key: str, future: asyncio.Future[Optional[str]]) -> None:
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        summary = self._cache.get(key)
+        if summary is not None:
+            self._cache.move_to_end(key)
+        return summary
+
+    def _cache_put(self, key: str, summary: str) -> None:
+        self._cache[key] = summary
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._settings.summary_cache_size:
+            self._cache.popitem(last=False)
 
     def _prepare_text(self, text: str) -> str:
-        words = text.split()
-        limit = self._settings.summary_chunk_size
-        if len(words) <= limit:
+        # ~6 characters per word keeps the budget without splitting the whole text into words.
+        approx = self._settings.summary_chunk_size * 6
+        if len(text) <= approx:
             return text
-        return " ".join(words[:limit])
+        cut = text.rfind(" ", 0, approx)
+        return text[: cut if cut > 0 else approx]
+
+
+def _content_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", errors="replace"), digest_size=16).hexdigest()
+
+
+async def _summary_for(batch: asyncio.Future[dict[str, str]], url: str) -> Optional[str]:
+    return (await batch).get(url)
+
+
+def _split_sections(response: str) -> dict[int, str]:
+    matches = list(_SECTION_HEADER.finditer(response))
+    sections: dict[int, str] = {}
+    for position, match in enumerate(matches):
+        end = matches[position + 1].start() if position + 1 < len(matches) else len(response)
+        body = response[match.end():end].strip()
+        if body:
+            sections.setdefault(int(match.group(1)), body)
+    return sections
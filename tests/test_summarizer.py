@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.config import Settings
+from app.services.scraper import ScrapedDocument
+from app.services.summarizer import SummarizerService
+
+
+class FakeLLM:
+    """Stand-in for LocalLLM that counts whitespace-separated words as tokens."""
+
+    def __init__(self, replies: List[Any]):
+        self.replies = list(replies)
+        self.calls: List[str] = []
+
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        return " ".join(text.split()[:max_tokens])
+
+    async def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+    ) -> str:
+        self.calls.append(messages[1]["content"][0]["text"])
+        await asyncio.sleep(0.01)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def _settings() -> Settings:
+    return Settings(brave_api_key="test", summary_skip_threshold=10)
+
+
+def _documents(count: int) -> List[ScrapedDocument]:
+    return [
+        ScrapedDocument(url=f"https://example.com/{idx}", title=f"Page {idx}", text=f"page {idx} " * 50)
+        for idx in range(1, count + 1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_summarize_many_parses_batched_sections() -> None:
+    llm = FakeLLM(["### [1] First summary\n### [2]\nSecond summary\n### [3]\n- third"])
+    service = SummarizerService(llm, _settings())  # type: ignore[arg-type]
+
+    summaries = await service.summarize_many(_documents(3))
+
+    assert summaries == {
+        "https://example.com/1": "First summary",
+        "https://example.com/2": "Second summary",
+        "https://example.com/3": "- third",
+    }
+    assert len(llm.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_summarize_many_falls_back_for_missing_sections() -> None:
+    llm = FakeLLM(["### [1]\nFirst summary\n### [3]\nThird summary", "Second summary"])
+    service = SummarizerService(llm, _settings())  # type: ignore[arg-type]
+
+    summaries = await service.summarize_many(_documents(3))
+
+    assert summaries["https://example.com/2"] == "Second summary"
+    assert len(summaries) == 3
+    assert len(llm.calls) == 2
+    assert "Content from Page 2" in llm.calls[1]
+
+
+@pytest.mark.asyncio
+async def test_summarize_many_falls_back_when_batch_call_fails() -> None:
+    llm = FakeLLM([RuntimeError("context window exceeded"), "one", "two"])
+    service = SummarizerService(llm, _settings())  # type: ignore[arg-type]
+
+    summaries = await service.summarize_many(_documents(2))
+
+    assert summaries == {"https://example.com/1": "one", "https://example.com/2": "two"}
+    assert len(llm.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_inflight_batch() -> None:
+    llm = FakeLLM(["### [1]\nFirst summary\n### [2]\nSecond summary"])
+    service = SummarizerService(llm, _settings())  # type: ignore[arg-type]
+    documents = _documents(2)
+
+    batched, single = await asyncio.gather(
+        service.summarize_many(documents),
+        service.summarize(documents[1]),
+    )
+
+    assert batched == {
+        "https://example.com/1": "First summary",
+        "https://example.com/2": "Second summary",
+    }
+    assert single == "Second summary"
+    assert len(llm.calls) == 1